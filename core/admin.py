@@ -2,33 +2,137 @@
 Django Admin configuration for عودة آمنة - Safe Return.
 """
 
+from datetime import timedelta
+
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.db.models import Case, CharField, F, Value, When
+from django.db.models.functions import Substr
+from django.utils import timezone
 from .models import (
     User, ReleaseProfile, MonthlyCheckin,
     JobOpportunity, SupportTicket, Notification
 )
 
 
+def choice_label(field_name, choices):
+    """SQL CASE mapping a choice field's stored values to their labels."""
+    return Case(
+        *[When(**{field_name: value}, then=Value(label)) for value, label in choices],
+        default=F(field_name),
+        output_field=CharField(),
+    )
+
+
+class DeferringChangeList(ChangeList):
+    """ChangeList that leaves the admin's list_defer columns out of the query."""
+
+    def get_queryset(self, request, *args, **kwargs):
+        queryset = super().get_queryset(request, *args, **kwargs)
+        return queryset.defer(*self.model_admin.list_defer)
+
+
+class ListDeferAdmin(admin.ModelAdmin):
+    """
+    Base admin for models with large text columns.
+    Change forms still load every field; only the changelist skips them.
+    """
+    list_defer = []
+
+    def get_changelist(self, request, **kwargs):
+        return DeferringChangeList
+
+
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
-    list_display = ['full_name', 'national_id', 'role', 'phone', 'created_at']
+    list_display = ['full_name', 'national_id', 'role_label', 'phone', 'created_at']
     list_filter = ['role', 'created_at']
     search_fields = ['full_name', 'national_id', 'phone']
+    ordering = ['full_name']  # stable pages for autocomplete
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            role_label=choice_label('role', User.ROLE_CHOICES),
+        )
+
+    @admin.display(description='الدور', ordering='role')
+    def role_label(self, obj):
+        return obj.role_label
+
+    def get_search_results(self, request, queryset, search_term):
+        # A full national ID is looked up on its unique index; anything else
+        # (names, partial numbers, phones) gets the default substring search
+        term = search_term.strip()
+        if len(term) == 10 and term.isdigit():
+            matches = queryset.filter(national_id=term)
+            if matches.exists():
+                return matches, False
+        return super().get_search_results(request, queryset, search_term)
+
+
+class CurrentMonthFilter(admin.SimpleListFilter):
+    """
+    Filter profiles by plan month.
+    Translates the month into a release_date range so it runs in SQL.
+    """
+    title = 'الشهر الحالي'
+    parameter_name = 'month'
+
+    months = [str(month) for month in range(1, 13)]
+
+    def lookups(self, request, model_admin):
+        return [(month, month) for month in self.months]
+
+    def queryset(self, request, queryset):
+        # Ignore anything that isn't one of the offered months (e.g. ?month=abc)
+        if self.value() not in self.months:
+            return queryset
+        month = int(self.value())
+        today = timezone.now().date()
+        # Mirrors ReleaseProfile.current_month: 30-day months, capped at 12
+        queryset = queryset.filter(release_date__lte=today - timedelta(days=30 * (month - 1)))
+        if month < 12:
+            queryset = queryset.filter(release_date__gt=today - timedelta(days=30 * month))
+        return queryset
 
 
 @admin.register(ReleaseProfile)
-class ReleaseProfileAdmin(admin.ModelAdmin):
-    list_display = ['user', 'risk_level', 'city', 'release_date', 'is_completed']
-    list_filter = ['risk_level', 'city', 'is_completed']
+class ReleaseProfileAdmin(ListDeferAdmin):
+    list_display = ['user', 'risk_level_label', 'city', 'release_date', 'current_month', 'is_completed']
+    list_select_related = ['user']
+    list_filter = ['risk_level', 'city', CurrentMonthFilter, 'is_completed']
     search_fields = ['user__full_name', 'user__national_id']
-    raw_id_fields = ['user', 'assigned_case_worker']
+    autocomplete_fields = ['user', 'assigned_case_worker']
+    list_defer = ['notes']
+
+    def get_queryset(self, request):
+        # __str__ reads user.full_name
+        return super().get_queryset(request).select_related('user').annotate(
+            risk_level_label=choice_label('risk_level', ReleaseProfile.RISK_LEVEL_CHOICES),
+        )
+
+    @admin.display(description='مستوى الخطورة', ordering='risk_level')
+    def risk_level_label(self, obj):
+        return obj.risk_level_label
+
+    @admin.display(description='الشهر الحالي', ordering='-release_date')
+    def current_month(self, obj):
+        # Later release date means an earlier month, so sort on the column
+        return obj.current_month
 
 
 @admin.register(MonthlyCheckin)
-class MonthlyCheckinAdmin(admin.ModelAdmin):
+class MonthlyCheckinAdmin(ListDeferAdmin):
     list_display = ['release_profile', 'month_index', 'housing_status', 'job_status', 'mental_state', 'created_at']
+    list_select_related = ['release_profile__user']
     list_filter = ['month_index', 'housing_status', 'job_status', 'mental_state']
     search_fields = ['release_profile__user__full_name']
+    list_defer = ['free_text_notes', 'release_profile__notes']
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'release_profile':
+            kwargs['queryset'] = ReleaseProfile.objects.select_related('user')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 
 @admin.register(JobOpportunity)
@@ -39,14 +143,46 @@ class JobOpportunityAdmin(admin.ModelAdmin):
 
 
 @admin.register(SupportTicket)
-class SupportTicketAdmin(admin.ModelAdmin):
-    list_display = ['release_profile', 'ticket_type', 'status', 'is_auto_generated', 'created_at']
+class SupportTicketAdmin(ListDeferAdmin):
+    list_display = ['release_profile', 'ticket_type_label', 'status_label', 'is_auto_generated', 'created_at']
+    list_select_related = ['release_profile__user']
     list_filter = ['ticket_type', 'status', 'is_auto_generated']
     search_fields = ['release_profile__user__full_name', 'notes']
+    list_defer = ['notes', 'release_profile__notes']
+
+    def get_queryset(self, request):
+        # __str__ reads release_profile.user.full_name
+        return super().get_queryset(request).select_related('release_profile__user').annotate(
+            ticket_type_label=choice_label('ticket_type', SupportTicket.TYPE_CHOICES),
+            status_label=choice_label('status', SupportTicket.STATUS_CHOICES),
+        )
+
+    @admin.display(description='نوع التذكرة', ordering='ticket_type')
+    def ticket_type_label(self, obj):
+        return obj.ticket_type_label
+
+    @admin.display(description='الحالة', ordering='status')
+    def status_label(self, obj):
+        return obj.status_label
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'release_profile':
+            kwargs['queryset'] = ReleaseProfile.objects.select_related('user')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 
 @admin.register(Notification)
-class NotificationAdmin(admin.ModelAdmin):
-    list_display = ['user', 'message', 'is_read', 'created_at']
+class NotificationAdmin(ListDeferAdmin):
+    list_display = ['user', 'message_preview', 'is_read', 'created_at']
+    list_select_related = ['user']
     list_filter = ['is_read', 'created_at']
     search_fields = ['user__full_name', 'message']
+    list_defer = ['message']
+
+    def get_queryset(self, request):
+        # Only the first 50 characters leave the database for the list
+        return super().get_queryset(request).annotate(message_preview=Substr('message', 1, 50))
+
+    @admin.display(description='الرسالة')
+    def message_preview(self, obj):
+        return obj.message_preview
@@ -1,6 +1,42 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+
+
+# WAL lets dashboard reads run while a check-in is being written
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA cache_size=-64000',
+)
+
+
+def tune_sqlite(sender, connection, **kwargs):
+    """Apply the SQLite PRAGMAs to every new connection."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+
+
+def refresh_latest_checkin(sender, instance, raw=False, **kwargs):
+    """Re-point the profile's latest_checkin after any check-in is saved or deleted."""
+    if raw:
+        return
+    from .models import ReleaseProfile
+    ReleaseProfile.objects.filter(pk=instance.release_profile_id).refresh_latest_checkin()
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        connection_created.connect(tune_sqlite, dispatch_uid='core.tune_sqlite')
+        # Covers admin edits and deletes too; bulk_create callers refresh it themselves
+        checkin = self.get_model('MonthlyCheckin')
+        post_save.connect(refresh_latest_checkin, sender=checkin, dispatch_uid='core.latest_checkin_saved')
+        post_delete.connect(refresh_latest_checkin, sender=checkin, dispatch_uid='core.latest_checkin_deleted')
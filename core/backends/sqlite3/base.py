@@ -0,0 +1,24 @@
+"""
+SQLite backend with Django 5.1's OPTIONS['transaction_mode'] for Django 4.2.
+Drop it in favour of the stock backend once the project is on 5.1+.
+"""
+
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    transaction_mode = None
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        # Not a sqlite3.connect() argument; used when opening transactions
+        self.transaction_mode = params.pop('transaction_mode', None)
+        return params
+
+    def _start_transaction_under_autocommit(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so a transaction that
+        # reads and then writes can't hit SQLITE_BUSY when upgrading its lock
+        if self.transaction_mode:
+            self.cursor().execute(f'BEGIN {self.transaction_mode}')
+        else:
+            super()._start_transaction_under_autocommit()
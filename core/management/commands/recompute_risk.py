@@ -0,0 +1,18 @@
+"""
+Risk recalculation command for عودة آمنة - Safe Return
+Re-scores every profile from its latest monthly check-in.
+
+Usage: python manage.py recompute_risk
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.risk_engine import bulk_recompute_risk
+
+
+class Command(BaseCommand):
+    help = 'Recalculates risk levels for all profiles from their latest check-in'
+
+    def handle(self, *args, **options):
+        updated = bulk_recompute_risk()
+        self.stdout.write(self.style.SUCCESS(f'✅ تم تحديث مستوى الخطورة في {updated} ملف'))
@@ -2,11 +2,16 @@
 Seed data command for عودة آمنة - Safe Return
 Creates demo data for hackathon presentation.
 
-Usage: python manage.py seed_data
+Usage: python manage.py seed_data [--clear]
+
+Safe to re-run: rows that already exist are left untouched.
+Pass --clear to wipe the demo tables and start fresh.
 """
 
 from django.core.management.base import BaseCommand
+from django.db import connection, transaction
 from django.utils import timezone
+from collections import Counter
 from datetime import timedelta
 import random
 
@@ -19,27 +24,68 @@ from core.models import (
 class Command(BaseCommand):
     help = 'Seeds the database with demo data for Safe Return hackathon'
 
+    # Children before parents so FK constraints hold without cascading
+    CLEAR_ORDER = [
+        Notification, SupportTicket, MonthlyCheckin,
+        ReleaseProfile, JobOpportunity, User,
+    ]
+
+    def clear_existing_data(self):
+        """
+        Wipe all seeded tables with one statement per table.
+        Avoids .delete(), which loads every row to cascade in Python.
+        """
+        tables = [model._meta.db_table for model in self.CLEAR_ORDER]
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                if connection.vendor == 'postgresql':
+                    cursor.execute(
+                        'TRUNCATE %s RESTART IDENTITY CASCADE'
+                        % ', '.join(connection.ops.quote_name(t) for t in tables)
+                    )
+                else:
+                    for table in tables:
+                        cursor.execute('DELETE FROM %s' % connection.ops.quote_name(table))
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete existing demo data before seeding',
+        )
+
+    def insert_missing(self, model, objs, key):
+        """
+        bulk_create that skips rows already present under the natural key.
+        ignore_conflicts doesn't return primary keys, so read them back in one query.
+        """
+        model.objects.bulk_create(objs, ignore_conflicts=True, batch_size=1000)
+        keys = [getattr(obj, key) for obj in objs]
+        pks = dict(model.objects.filter(**{f'{key}__in': keys}).values_list(key, 'pk'))
+        for obj in objs:
+            obj.pk = pks[getattr(obj, key)]
+
+    @transaction.atomic
     def handle(self, *args, **options):
-        self.stdout.write('🌱 بدء إنشاء البيانات التجريبية...\n')
+        # Collected and written once at the end instead of per step
+        msgs = ['🌱 بدء إنشاء البيانات التجريبية...\n']
         
         # Clear existing data
-        self.stdout.write('🗑️  حذف البيانات السابقة...')
-        Notification.objects.all().delete()
-        SupportTicket.objects.all().delete()
-        MonthlyCheckin.objects.all().delete()
-        ReleaseProfile.objects.all().delete()
-        JobOpportunity.objects.all().delete()
-        User.objects.all().delete()
+        if options['clear']:
+            msgs.append('🗑️  حذف البيانات السابقة...')
+            self.clear_existing_data()
         
+        today = timezone.now().date()
+
         # Create Case Workers
-        self.stdout.write('👨‍💼 إنشاء حسابات الأخصائيين...')
-        caseworker1 = User.objects.create(
+        msgs.append('👨‍💼 إنشاء حسابات الأخصائيين...')
+        caseworker1 = User(
             national_id='1234567890',
             full_name='فهد الزهراني',
             role='case_worker',
             phone='0551234567'
         )
-        caseworker2 = User.objects.create(
+        caseworker2 = User(
             national_id='1234567891',
             full_name='سارة القحطاني',
             role='case_worker',
@@ -47,26 +93,30 @@ class Command(BaseCommand):
         )
         
         # Create Beneficiaries with different scenarios
-        self.stdout.write('👤 إنشاء حسابات المستفيدين...')
+        msgs.append('👤 إنشاء حسابات المستفيدين...')
+        users = [caseworker1, caseworker2]
+        profiles = []
+        checkins = []
+        tickets = []
         
         # Beneficiary 1: Good progress (Green)
-        user1 = User.objects.create(
+        user1 = User(
             national_id='1111111111',
             full_name='أحمد محمد العتيبي',
             role='beneficiary',
             phone='0501112222'
         )
-        profile1 = ReleaseProfile.objects.create(
+        profile1 = ReleaseProfile(
             user=user1,
-            release_date=timezone.now().date() - timedelta(days=90),  # 3 months ago
+            release_date=today - timedelta(days=90),  # 3 months ago
             city='riyadh',
             risk_level='green',
             assigned_case_worker=caseworker1,
             notes='حالة مستقرة، عاد للعمل في ورشة والده'
         )
         # Add check-ins for months 1-3
-        for month in range(1, 4):
-            MonthlyCheckin.objects.create(
+        checkins += [
+            MonthlyCheckin(
                 release_profile=profile1,
                 month_index=month,
                 housing_status='with_family',
@@ -75,63 +125,67 @@ class Command(BaseCommand):
                 family_status='supportive',
                 free_text_notes='الحمد لله، الأمور تسير بشكل جيد'
             )
+            for month in range(1, 4)
+        ]
         
         # Beneficiary 2: Medium risk (Yellow) - needs job support
-        user2 = User.objects.create(
+        user2 = User(
             national_id='2222222222',
             full_name='خالد سعد الغامدي',
             role='beneficiary',
             phone='0502223333'
         )
-        profile2 = ReleaseProfile.objects.create(
+        profile2 = ReleaseProfile(
             user=user2,
-            release_date=timezone.now().date() - timedelta(days=60),  # 2 months ago
+            release_date=today - timedelta(days=60),  # 2 months ago
             city='jeddah',
             risk_level='yellow',
             assigned_case_worker=caseworker1,
             notes='يحتاج دعم في إيجاد عمل مناسب'
         )
-        MonthlyCheckin.objects.create(
-            release_profile=profile2,
-            month_index=1,
-            housing_status='with_family',
-            job_status='searching',
-            mental_state='moderate',
-            family_status='supportive'
-        )
-        MonthlyCheckin.objects.create(
-            release_profile=profile2,
-            month_index=2,
-            housing_status='with_family',
-            job_status='unemployed',
-            mental_state='stressed',
-            family_status='supportive',
-            free_text_notes='أبحث عن عمل لكن لم أجد حتى الآن'
-        )
-        SupportTicket.objects.create(
+        checkins += [
+            MonthlyCheckin(
+                release_profile=profile2,
+                month_index=1,
+                housing_status='with_family',
+                job_status='searching',
+                mental_state='moderate',
+                family_status='supportive'
+            ),
+            MonthlyCheckin(
+                release_profile=profile2,
+                month_index=2,
+                housing_status='with_family',
+                job_status='unemployed',
+                mental_state='stressed',
+                family_status='supportive',
+                free_text_notes='أبحث عن عمل لكن لم أجد حتى الآن'
+            ),
+        ]
+        tickets.append(SupportTicket(
             release_profile=profile2,
             ticket_type='job',
             status='in_progress',
             notes='تم التنسيق مع طاقات لترشيحه لوظيفة أمن',
             is_auto_generated=True
-        )
+        ))
         
         # Beneficiary 3: High risk (Red) - needs urgent intervention
-        user3 = User.objects.create(
+        user3 = User(
             national_id='3333333333',
             full_name='عبدالله فيصل الدوسري',
             role='beneficiary',
             phone='0503334444'
         )
-        profile3 = ReleaseProfile.objects.create(
+        profile3 = ReleaseProfile(
             user=user3,
-            release_date=timezone.now().date() - timedelta(days=30),  # 1 month ago
+            release_date=today - timedelta(days=30),  # 1 month ago
             city='dammam',
             risk_level='red',
             assigned_case_worker=caseworker2,
             notes='حالة تحتاج متابعة مكثفة - مشكلات أسرية'
         )
-        MonthlyCheckin.objects.create(
+        checkins.append(MonthlyCheckin(
             release_profile=profile3,
             month_index=1,
             housing_status='temporary',
@@ -139,40 +193,42 @@ class Command(BaseCommand):
             mental_state='bad',
             family_status='problematic',
             free_text_notes='العائلة رافضة استقبالي، أحتاج مساعدة عاجلة'
-        )
-        SupportTicket.objects.create(
-            release_profile=profile3,
-            ticket_type='psychological',
-            status='open',
-            notes='حالة نفسية سيئة - يحتاج جلسة عاجلة',
-            is_auto_generated=True
-        )
-        SupportTicket.objects.create(
-            release_profile=profile3,
-            ticket_type='housing',
-            status='open',
-            notes='بحاجة لسكن مؤقت',
-            is_auto_generated=True
-        )
-        SupportTicket.objects.create(
-            release_profile=profile3,
-            ticket_type='social',
-            status='open',
-            notes='محاولة إصلاح العلاقة الأسرية',
-            created_by=caseworker2,
-            is_auto_generated=False
-        )
+        ))
+        tickets += [
+            SupportTicket(
+                release_profile=profile3,
+                ticket_type='psychological',
+                status='open',
+                notes='حالة نفسية سيئة - يحتاج جلسة عاجلة',
+                is_auto_generated=True
+            ),
+            SupportTicket(
+                release_profile=profile3,
+                ticket_type='housing',
+                status='open',
+                notes='بحاجة لسكن مؤقت',
+                is_auto_generated=True
+            ),
+            SupportTicket(
+                release_profile=profile3,
+                ticket_type='social',
+                status='open',
+                notes='محاولة إصلاح العلاقة الأسرية',
+                created_by=caseworker2,
+                is_auto_generated=False
+            ),
+        ]
         
         # Beneficiary 4: New case (just released)
-        user4 = User.objects.create(
+        user4 = User(
             national_id='4444444444',
             full_name='محمد علي الشهري',
             role='beneficiary',
             phone='0504445555'
         )
-        profile4 = ReleaseProfile.objects.create(
+        profile4 = ReleaseProfile(
             user=user4,
-            release_date=timezone.now().date() - timedelta(days=5),  # 5 days ago
+            release_date=today - timedelta(days=5),  # 5 days ago
             city='riyadh',
             risk_level='green',
             assigned_case_worker=caseworker1,
@@ -180,23 +236,23 @@ class Command(BaseCommand):
         )
         
         # Beneficiary 5: Almost completed (month 11)
-        user5 = User.objects.create(
+        user5 = User(
             national_id='5555555555',
             full_name='سلطان ناصر المطيري',
             role='beneficiary',
             phone='0505556666'
         )
-        profile5 = ReleaseProfile.objects.create(
+        profile5 = ReleaseProfile(
             user=user5,
-            release_date=timezone.now().date() - timedelta(days=330),  # 11 months ago
+            release_date=today - timedelta(days=330),  # 11 months ago
             city='mecca',
             risk_level='green',
             assigned_case_worker=caseworker2,
             notes='حالة نموذجية - قارب على إكمال البرنامج'
         )
         # Add all 11 check-ins
-        for month in range(1, 12):
-            MonthlyCheckin.objects.create(
+        checkins += [
+            MonthlyCheckin(
                 release_profile=profile5,
                 month_index=month,
                 housing_status='stable',
@@ -204,9 +260,33 @@ class Command(BaseCommand):
                 mental_state='good',
                 family_status='supportive'
             )
+            for month in range(1, 12)
+        ]
+        
+        users += [user1, user2, user3, user4, user5]
+        profiles += [profile1, profile2, profile3, profile4, profile5]
+        
+        # Tickets and notifications have no natural key, so only users
+        # seeded by this run get them
+        existing_ids = set(
+            User.objects.filter(national_id__in=[u.national_id for u in users])
+            .values_list('national_id', flat=True)
+        )
+        
+        # One INSERT per model, parents before children so FK ids are set
+        self.insert_missing(User, users, 'national_id')
+        self.insert_missing(ReleaseProfile, profiles, 'user_id')
+        MonthlyCheckin.objects.bulk_create(checkins, ignore_conflicts=True, batch_size=1000)
+        ReleaseProfile.objects.filter(
+            user__national_id__in=[u.national_id for u in users]
+        ).refresh_latest_checkin()
+        SupportTicket.objects.bulk_create(
+            [t for t in tickets if t.release_profile.user.national_id not in existing_ids],
+            batch_size=1000
+        )
         
         # Create Job Opportunities
-        self.stdout.write('💼 إنشاء فرص العمل...')
+        msgs.append('💼 إنشاء فرص العمل...')
         jobs_data = [
             {
                 'title': 'حارس أمن',
@@ -259,46 +339,58 @@ class Command(BaseCommand):
             },
         ]
         
-        for job_data in jobs_data:
-            JobOpportunity.objects.create(**job_data)
+        JobOpportunity.objects.bulk_create(
+            [JobOpportunity(**job_data) for job_data in jobs_data],
+            ignore_conflicts=True,
+            batch_size=1000
+        )
         
         # Create some notifications
-        self.stdout.write('🔔 إنشاء الإشعارات...')
-        Notification.objects.create(
-            user=caseworker1,
-            message='⚠️ تنبيه: عبدالله الدوسري يحتاج دعم نفسي عاجل',
-            link='/caseworker/profile/3/'
-        )
-        Notification.objects.create(
-            user=caseworker2,
-            message='📋 تذكير: متابعة حالة سلطان المطيري - الشهر الأخير',
-            link='/caseworker/profile/5/'
-        )
-        Notification.objects.create(
-            user=user2,
-            message='💼 تم ترشيحك لوظيفة جديدة! تحقق من التفاصيل',
-            link='/beneficiary/jobs/'
-        )
-        Notification.objects.create(
-            user=user4,
-            message='👋 مرحباً بك في برنامج عودة آمنة! يرجى تعبئة المتابعة الأولى',
-            link='/beneficiary/checkin/1/'
+        msgs.append('🔔 إنشاء الإشعارات...')
+        notifications = [
+            Notification(
+                user=caseworker1,
+                message='⚠️ تنبيه: عبدالله الدوسري يحتاج دعم نفسي عاجل',
+                link=f'/caseworker/profile/{profile3.pk}/'
+            ),
+            Notification(
+                user=caseworker2,
+                message='📋 تذكير: متابعة حالة سلطان المطيري - الشهر الأخير',
+                link=f'/caseworker/profile/{profile5.pk}/'
+            ),
+            Notification(
+                user=user2,
+                message='💼 تم ترشيحك لوظيفة جديدة! تحقق من التفاصيل',
+                link='/beneficiary/jobs/'
+            ),
+            Notification(
+                user=user4,
+                message='👋 مرحباً بك في برنامج عودة آمنة! يرجى تعبئة المتابعة الأولى',
+                link='/beneficiary/checkin/1/'
+            ),
+        ]
+        Notification.objects.bulk_create(
+            [n for n in notifications if n.user.national_id not in existing_ids],
+            batch_size=1000
         )
         
         # Summary
-        self.stdout.write('\n' + '='*50)
-        self.stdout.write(self.style.SUCCESS('✅ تم إنشاء البيانات التجريبية بنجاح!'))
-        self.stdout.write('='*50)
-        self.stdout.write(f'\n📊 ملخص البيانات:')
-        self.stdout.write(f'   • الأخصائيون: {User.objects.filter(role="case_worker").count()}')
-        self.stdout.write(f'   • المستفيدون: {User.objects.filter(role="beneficiary").count()}')
-        self.stdout.write(f'   • ملفات الإفراج: {ReleaseProfile.objects.count()}')
-        self.stdout.write(f'   • المتابعات الشهرية: {MonthlyCheckin.objects.count()}')
-        self.stdout.write(f'   • فرص العمل: {JobOpportunity.objects.count()}')
-        self.stdout.write(f'   • تذاكر الدعم: {SupportTicket.objects.count()}')
-        self.stdout.write(f'   • الإشعارات: {Notification.objects.count()}')
+        msgs.append('\n' + '='*50)
+        msgs.append(self.style.SUCCESS('✅ تم إنشاء البيانات التجريبية بنجاح!'))
+        msgs.append('='*50)
+        msgs.append(f'\n📊 ملخص البيانات:')
+        # Every seeded row exists now (inserted or kept), so count the built lists
+        role_counts = Counter(u.role for u in users)
+        msgs.append(f'   • الأخصائيون: {role_counts["case_worker"]}')
+        msgs.append(f'   • المستفيدون: {role_counts["beneficiary"]}')
+        msgs.append(f'   • ملفات الإفراج: {len(profiles)}')
+        msgs.append(f'   • المتابعات الشهرية: {len(checkins)}')
+        msgs.append(f'   • فرص العمل: {len(jobs_data)}')
+        msgs.append(f'   • تذاكر الدعم: {len(tickets)}')
+        msgs.append(f'   • الإشعارات: {len(notifications)}')
         
-        self.stdout.write(f'\n🚀 يمكنك الآن تشغيل الخادم:')
-        self.stdout.write(f'   python manage.py runserver')
-        self.stdout.write(f'\n🌐 ثم افتح: http://127.0.0.1:8000/')
-
+        msgs.append(f'\n🚀 يمكنك الآن تشغيل الخادم:')
+        msgs.append(f'   python manage.py runserver')
+        msgs.append(f'\n🌐 ثم افتح: http://127.0.0.1:8000/')
+        
+        self.stdout.write('\n'.join(msgs))
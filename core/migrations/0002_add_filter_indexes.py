@@ -0,0 +1,66 @@
+# Generated by Django 4.2.30 on 2026-10-15 09:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobopportunity',
+            name='city',
+            field=models.CharField(choices=[('riyadh', 'الرياض'), ('jeddah', 'جدة'), ('mecca', 'مكة المكرمة'), ('medina', 'المدينة المنورة'), ('dammam', 'الدمام'), ('khobar', 'الخبر'), ('taif', 'الطائف'), ('tabuk', 'تبوك'), ('other', 'أخرى')], db_index=True, max_length=50, verbose_name='المدينة'),
+        ),
+        migrations.AlterField(
+            model_name='jobopportunity',
+            name='is_active',
+            field=models.BooleanField(db_index=True, default=True, verbose_name='نشط'),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='is_read',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='تمت القراءة'),
+        ),
+        migrations.AlterField(
+            model_name='releaseprofile',
+            name='city',
+            field=models.CharField(choices=[('riyadh', 'الرياض'), ('jeddah', 'جدة'), ('mecca', 'مكة المكرمة'), ('medina', 'المدينة المنورة'), ('dammam', 'الدمام'), ('khobar', 'الخبر'), ('taif', 'الطائف'), ('tabuk', 'تبوك'), ('other', 'أخرى')], db_index=True, default='riyadh', max_length=50, verbose_name='المدينة'),
+        ),
+        migrations.AlterField(
+            model_name='releaseprofile',
+            name='is_completed',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='مكتمل'),
+        ),
+        migrations.AlterField(
+            model_name='releaseprofile',
+            name='risk_level',
+            field=models.CharField(choices=[('green', '🟢 أخضر - Green'), ('yellow', '🟡 أصفر - Yellow'), ('red', '🔴 أحمر - Red')], db_index=True, default='green', max_length=10, verbose_name='مستوى الخطورة'),
+        ),
+        migrations.AlterField(
+            model_name='supportticket',
+            name='status',
+            field=models.CharField(choices=[('open', 'مفتوح - Open'), ('in_progress', 'قيد المعالجة - In Progress'), ('resolved', 'تم الحل - Resolved'), ('closed', 'مغلق - Closed')], db_index=True, default='open', max_length=20, verbose_name='الحالة'),
+        ),
+        migrations.AlterField(
+            model_name='supportticket',
+            name='ticket_type',
+            field=models.CharField(choices=[('job', '💼 دعم وظيفي - Job Support'), ('social', '🤝 دعم اجتماعي - Social Support'), ('psychological', '🧠 دعم نفسي - Psychological Support'), ('housing', '🏠 دعم سكني - Housing Support'), ('financial', '💰 دعم مالي - Financial Support')], db_index=True, max_length=20, verbose_name='نوع التذكرة'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='role',
+            field=models.CharField(choices=[('beneficiary', 'مستفيد - Beneficiary'), ('case_worker', 'أخصائي - Case Worker'), ('admin', 'مدير - Admin')], db_index=True, default='beneficiary', max_length=20, verbose_name='الدور'),
+        ),
+        migrations.AddIndex(
+            model_name='monthlycheckin',
+            index=models.Index(fields=['release_profile', '-month_index'], name='checkin_profile_month_desc'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', '-created_at'], name='notif_user_read_created_idx'),
+        ),
+    ]
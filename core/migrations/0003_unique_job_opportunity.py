@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-15 09:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_add_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='jobopportunity',
+            unique_together={('title', 'company', 'city')},
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-15 09:15
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_beneficiary_names(apps, schema_editor):
+    MonthlyCheckin = apps.get_model('core', 'MonthlyCheckin')
+    ReleaseProfile = apps.get_model('core', 'ReleaseProfile')
+    names = ReleaseProfile.objects.filter(pk=OuterRef('release_profile_id')).values('user__full_name')[:1]
+    MonthlyCheckin.objects.update(beneficiary_name=Subquery(names))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_notification_unread_partial_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monthlycheckin',
+            name='beneficiary_name',
+            field=models.CharField(blank=True, editable=False, max_length=200, verbose_name='اسم المستفيد'),
+        ),
+        migrations.RunPython(copy_beneficiary_names, migrations.RunPython.noop),
+    ]
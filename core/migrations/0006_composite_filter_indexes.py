@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-15 09:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_checkin_beneficiary_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='releaseprofile',
+            index=models.Index(fields=['is_completed', 'risk_level'], name='profile_active_risk_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='releaseprofile',
+            index=models.Index(fields=['assigned_case_worker', 'is_completed'], name='profile_worker_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supportticket',
+            index=models.Index(fields=['release_profile', 'status'], name='ticket_profile_status_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-15 09:26
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def fill_latest_checkins(apps, schema_editor):
+    MonthlyCheckin = apps.get_model('core', 'MonthlyCheckin')
+    ReleaseProfile = apps.get_model('core', 'ReleaseProfile')
+    latest = MonthlyCheckin.objects.filter(release_profile=OuterRef('pk')).order_by('-month_index').values('id')[:1]
+    ReleaseProfile.objects.update(latest_checkin=Subquery(latest))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_composite_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='releaseprofile',
+            name='latest_checkin',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.monthlycheckin', verbose_name='آخر متابعة'),
+        ),
+        migrations.RunPython(fill_latest_checkins, migrations.RunPython.noop),
+    ]
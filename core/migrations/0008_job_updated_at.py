@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-15 09:38
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def start_from_created_at(apps, schema_editor):
+    JobOpportunity = apps.get_model('core', 'JobOpportunity')
+    JobOpportunity.objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_profile_latest_checkin'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobopportunity',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(start_from_created_at, migrations.RunPython.noop),
+    ]
@@ -5,6 +5,7 @@ Data models for the reentry support service
 
 from django.db import models
 from django.utils import timezone
+from django.utils.functional import cached_property
 from datetime import timedelta
 
 
@@ -33,6 +34,7 @@ class User(models.Model):
         max_length=20, 
         choices=ROLE_CHOICES, 
         default='beneficiary',
+        db_index=True,
         verbose_name='الدور'
     )
     phone = models.CharField(
@@ -48,6 +50,34 @@ class User(models.Model):
     
     def __str__(self):
         return f"{self.full_name} ({self.get_role_display()})"
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'full_name' in update_fields:
+            # Keep the name copied onto check-ins in step; a no-op unless it changed
+            MonthlyCheckin.objects.filter(release_profile__user=self).exclude(
+                beneficiary_name=self.full_name
+            ).update(beneficiary_name=self.full_name)
+
+
+class ReleaseProfileQuerySet(models.QuerySet):
+    """QuerySet for ReleaseProfile that keeps derived fields filled on bulk inserts."""
+
+    def refresh_latest_checkin(self):
+        """Point latest_checkin at each profile's highest-month check-in in one UPDATE."""
+        latest = MonthlyCheckin.objects.filter(
+            release_profile=models.OuterRef('pk')
+        ).order_by('-month_index').values('id')[:1]
+        # update() skips auto_now; bump updated_at so check-in changes reach the dashboard ETag
+        return self.update(latest_checkin=models.Subquery(latest), updated_at=timezone.now())
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create() bypasses save(), so derive the end date here as well
+        objs = list(objs)
+        for profile in objs:
+            profile.set_followup_end_date()
+        return super().bulk_create(objs, *args, **kwargs)
 
 
 class ReleaseProfile(models.Model):
@@ -89,12 +119,14 @@ class ReleaseProfile(models.Model):
         max_length=10, 
         choices=RISK_LEVEL_CHOICES, 
         default='green',
+        db_index=True,
         verbose_name='مستوى الخطورة'
     )
     city = models.CharField(
         max_length=50, 
         choices=CITY_CHOICES, 
         default='riyadh',
+        db_index=True,
         verbose_name='المدينة'
     )
     notes = models.TextField(
@@ -112,26 +144,54 @@ class ReleaseProfile(models.Model):
     )
     is_completed = models.BooleanField(
         default=False,
+        db_index=True,
         verbose_name='مكتمل'
     )
+    # Re-pointed whenever a check-in is saved or deleted (see CoreConfig.ready)
+    latest_checkin = models.ForeignKey(
+        'MonthlyCheckin',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        verbose_name='آخر متابعة'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ReleaseProfileQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'ملف الإفراج'
         verbose_name_plural = 'ملفات الإفراج'
         ordering = ['-created_at']
+        indexes = [
+            # Active profiles by risk level (dashboard counts and filter)
+            models.Index(fields=['is_completed', 'risk_level'], name='profile_active_risk_idx'),
+            # A case worker's active caseload
+            models.Index(fields=['assigned_case_worker', 'is_completed'], name='profile_worker_active_idx'),
+        ]
     
     def __str__(self):
         return f"ملف {self.user.full_name} - {self.get_risk_level_display()}"
     
     def save(self, *args, **kwargs):
-        # Auto-calculate end of followup date (12 months from release)
+        self.set_followup_end_date()
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'user' in update_fields:
+            # The profile may have moved to another user; re-copy their name onto its check-ins
+            self.checkins.exclude(
+                beneficiary_name=self.user.full_name
+            ).update(beneficiary_name=self.user.full_name)
+    
+    def set_followup_end_date(self):
+        """Auto-calculate end of followup date (12 months from release)."""
         if self.release_date and not self.end_of_followup_date:
             self.end_of_followup_date = self.release_date + timedelta(days=365)
-        super().save(*args, **kwargs)
     
-    @property
+    @cached_property
     def current_month(self):
         """Calculate which month of the 12-month plan we're in."""
         if not self.release_date:
@@ -140,12 +200,23 @@ class ReleaseProfile(models.Model):
         month = (days_since_release // 30) + 1
         return min(month, 12)  # Cap at 12 months
     
-    @property
+    @cached_property
     def progress_percentage(self):
         """Calculate progress through the 12-month plan."""
         return min(100, int((self.current_month / 12) * 100))
 
 
+class MonthlyCheckinQuerySet(models.QuerySet):
+    """QuerySet for MonthlyCheckin that keeps the cached name filled on bulk inserts."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create() bypasses save(), so copy the name here as well
+        objs = list(objs)
+        for checkin in objs:
+            checkin.set_beneficiary_name()
+        return super().bulk_create(objs, *args, **kwargs)
+
+
 class MonthlyCheckin(models.Model):
     """
     Monthly check-in form submitted by the beneficiary.
@@ -213,16 +284,51 @@ class MonthlyCheckin(models.Model):
         blank=True, 
         verbose_name='ملاحظات إضافية'
     )
+    # Copy of release_profile.user.full_name so __str__ needs no joins
+    beneficiary_name = models.CharField(
+        max_length=200,
+        blank=True,
+        editable=False,
+        verbose_name='اسم المستفيد'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = MonthlyCheckinQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'متابعة شهرية'
         verbose_name_plural = 'المتابعات الشهرية'
         ordering = ['-month_index']
         unique_together = ['release_profile', 'month_index']
+        indexes = [
+            # A profile's check-ins, newest month first
+            models.Index(fields=['release_profile', '-month_index'], name='checkin_profile_month_desc'),
+        ]
     
     def __str__(self):
-        return f"متابعة الشهر {self.month_index} - {self.release_profile.user.full_name}"
+        return f"متابعة الشهر {self.month_index} - {self.beneficiary_name}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the owner so save() can tell when the check-in is reassigned
+        if 'release_profile_id' in instance.__dict__:
+            instance._loaded_profile_id = instance.release_profile_id
+        return instance
+    
+    def save(self, *args, **kwargs):
+        self.set_beneficiary_name()
+        super().save(*args, **kwargs)
+        self._loaded_profile_id = self.release_profile_id
+    
+    def set_beneficiary_name(self):
+        """
+        Copy the beneficiary's name from the profile when it is unset or the
+        check-in moved to another profile (User.save() keeps it current on renames).
+        """
+        moved = self.release_profile_id != getattr(self, '_loaded_profile_id', self.release_profile_id)
+        if not self.beneficiary_name or moved:
+            self.beneficiary_name = self.release_profile.user.full_name
 
 
 class JobOpportunity(models.Model):
@@ -246,10 +352,12 @@ class JobOpportunity(models.Model):
     city = models.CharField(
         max_length=50, 
         choices=CITY_CHOICES,
+        db_index=True,
         verbose_name='المدينة'
     )
     is_active = models.BooleanField(
         default=True,
+        db_index=True,
         verbose_name='نشط'
     )
     link_url = models.URLField(
@@ -257,11 +365,13 @@ class JobOpportunity(models.Model):
         verbose_name='رابط التقديم'
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = 'فرصة عمل'
         verbose_name_plural = 'فرص العمل'
         ordering = ['-created_at']
+        unique_together = ['title', 'company', 'city']
     
     def __str__(self):
         return f"{self.title} - {self.get_city_display()}"
@@ -303,12 +413,14 @@ class SupportTicket(models.Model):
     ticket_type = models.CharField(
         max_length=20, 
         choices=TYPE_CHOICES,
+        db_index=True,
         verbose_name='نوع التذكرة'
     )
     status = models.CharField(
         max_length=20, 
         choices=STATUS_CHOICES, 
         default='open',
+        db_index=True,
         verbose_name='الحالة'
     )
     notes = models.TextField(
@@ -326,6 +438,10 @@ class SupportTicket(models.Model):
         verbose_name = 'تذكرة دعم'
         verbose_name_plural = 'تذاكر الدعم'
         ordering = ['-created_at']
+        indexes = [
+            # A profile's tickets by status (open ticket lookups and counts)
+            models.Index(fields=['release_profile', 'status'], name='ticket_profile_status_idx'),
+        ]
     
     def __str__(self):
         return f"{self.get_ticket_type_display()} - {self.release_profile.user.full_name}"
@@ -351,6 +467,7 @@ class Notification(models.Model):
     )
     is_read = models.BooleanField(
         default=False,
+        db_index=True,
         verbose_name='تمت القراءة'
     )
     created_at = models.DateTimeField(auto_now_add=True)
@@ -359,6 +476,15 @@ class Notification(models.Model):
         verbose_name = 'إشعار'
         verbose_name_plural = 'الإشعارات'
         ordering = ['-created_at']
+        indexes = [
+            # Unread notifications for a user, newest first; partial so
+            # read notifications never enter the index
+            models.Index(
+                fields=['user', '-created_at'],
+                condition=models.Q(is_read=False),
+                name='notif_unread_user_idx',
+            ),
+        ]
     
     def __str__(self):
         status = "✓" if self.is_read else "●"
@@ -0,0 +1,13 @@
+"""
+API pagination for عودة آمنة - Safe Return
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Cursor pagination over created_at (newest first), which every model has.
+    Cursors avoid the COUNT(*) that page-number pagination runs per request.
+    """
+    ordering = ('-created_at', '-id')
@@ -8,8 +8,37 @@ Risk Levels:
 - 🟢 GREEN: Low risk, stable situation
 """
 
-from .models import ReleaseProfile, SupportTicket, Notification
+from django.db import transaction
+from django.db.models import Case, Exists, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Now
+from django.db.models.lookups import Exact, In
 
+from .models import ReleaseProfile, MonthlyCheckin, SupportTicket, Notification
+
+
+# Family situations that raise a check-in to yellow
+YELLOW_FAMILY_STATUSES = frozenset({'problematic', 'no_contact'})
+
+# Case worker alerts for newly opened auto tickets, keyed by ticket type
+CASE_WORKER_ALERTS = {
+    'psychological': '⚠️ تنبيه: {name} يحتاج دعم نفسي عاجل',
+    'housing': '🏠 تنبيه: {name} بدون مأوى',
+}
+
+# Check-in answers that need follow-up:
+# (field, value, auto ticket type, ticket reason, risk factor, recommendation)
+RISK_RULES = (
+    ('mental_state', 'bad', 'psychological', 'الحالة النفسية سيئة',
+     'الحالة النفسية سيئة', 'إحالة للدعم النفسي عبر خط تراحم'),
+    ('housing_status', 'homeless', 'housing', 'بدون مأوى',
+     'بدون مأوى', 'التنسيق مع جمعية الإسكان الخيري'),
+    ('job_status', 'unemployed', 'job', 'عاطل عن العمل',
+     'عاطل عن العمل', 'عرض فرص العمل المتاحة في المنطقة'),
+    ('family_status', 'problematic', 'social', 'مشكلات عائلية',
+     'مشكلات عائلية', 'جلسة إرشاد أسري'),
+    ('family_status', 'no_contact', 'social', 'مشكلات عائلية',
+     'انقطاع التواصل الأسري', 'محاولة إعادة بناء الروابط الأسرية'),
+)
 
 def calculate_risk_level(checkin):
     """
@@ -27,28 +56,59 @@ def calculate_risk_level(checkin):
         str: 'red', 'yellow', or 'green'
     """
     # Red flags - high risk situations
-    red_conditions = [
-        checkin.mental_state == 'bad',
-        checkin.housing_status == 'homeless',
-    ]
+    if checkin.mental_state == 'bad' or checkin.housing_status == 'homeless':
+        return 'red'
     
     # Yellow flags - medium risk situations
-    yellow_conditions = [
-        checkin.job_status == 'unemployed',
-        checkin.family_status == 'problematic',
-        checkin.mental_state == 'stressed',
-        checkin.family_status == 'no_contact',
-    ]
-    
-    # Determine risk level
-    if any(red_conditions):
-        return 'red'
-    elif any(yellow_conditions):
+    if (
+        checkin.job_status == 'unemployed'
+        or checkin.family_status in YELLOW_FAMILY_STATUSES
+        or checkin.mental_state == 'stressed'
+    ):
         return 'yellow'
-    else:
-        return 'green'
+    
+    return 'green'
+
+
+def bulk_recompute_risk(queryset=None):
+    """
+    Recalculate risk levels for many profiles with a single UPDATE.
+    
+    Applies the same rules as calculate_risk_level to each profile's latest
+    check-in, entirely in SQL. Profiles without check-ins keep their level.
+    
+    Args:
+        queryset: ReleaseProfile queryset to limit the update (default: all)
+    
+    Returns:
+        int: Number of profiles whose risk level changed
+    """
+    if queryset is None:
+        queryset = ReleaseProfile.objects.all()
+    
+    latest = MonthlyCheckin.objects.filter(release_profile=OuterRef('pk')).order_by('-month_index')
+    mental = Subquery(latest.values('mental_state')[:1])
+    housing = Subquery(latest.values('housing_status')[:1])
+    job = Subquery(latest.values('job_status')[:1])
+    family = Subquery(latest.values('family_status')[:1])
+    
+    new_risk_level = Case(
+        When(Exact(mental, 'bad'), then=Value('red')),
+        When(Exact(housing, 'homeless'), then=Value('red')),
+        When(Exact(job, 'unemployed'), then=Value('yellow')),
+        When(In(family, list(YELLOW_FAMILY_STATUSES)), then=Value('yellow')),
+        When(Exact(mental, 'stressed'), then=Value('yellow')),
+        default=Value('green'),
+    )
+    return (
+        queryset
+        .filter(Exists(latest))
+        .exclude(Exact(F('risk_level'), new_risk_level))
+        .update(risk_level=new_risk_level, updated_at=Now())
+    )
 
 
+@transaction.atomic
 def process_checkin(checkin):
     """
     Process a check-in: calculate risk, update profile, create tickets if needed.
@@ -61,89 +121,63 @@ def process_checkin(checkin):
     Returns:
         dict: Processing results with risk level and any created tickets
     """
-    profile = checkin.release_profile
+    # Lock the profile so concurrent submissions can't both open the same tickets
+    profile = (
+        ReleaseProfile.objects.select_for_update(of=('self',))
+        .select_related('user')
+        .get(id=checkin.release_profile_id)
+    )
     
     # Calculate new risk level
     new_risk_level = calculate_risk_level(checkin)
     old_risk_level = profile.risk_level
     
-    # Update profile risk level
-    profile.risk_level = new_risk_level
-    profile.save()
-    
-    created_tickets = []
+    # Update profile risk level (only the columns that change, and only if it changed)
+    if new_risk_level != old_risk_level:
+        profile.risk_level = new_risk_level
+        profile.save(update_fields=['risk_level', 'updated_at'])
     
     # Auto-create support tickets based on check-in data
+    needed = [
+        (ticket_type, f'إنشاء تلقائي: {reason} في الشهر {checkin.month_index}')
+        for field, value, ticket_type, reason, _, _ in RISK_RULES
+        if getattr(checkin, field) == value
+    ]
     
-    # Psychological support if mental state is bad
-    if checkin.mental_state == 'bad':
-        ticket, created = SupportTicket.objects.get_or_create(
-            release_profile=profile,
-            ticket_type='psychological',
-            status='open',
-            is_auto_generated=True,
-            defaults={
-                'notes': f'إنشاء تلقائي: الحالة النفسية سيئة في الشهر {checkin.month_index}'
-            }
-        )
-        if created:
-            created_tickets.append(ticket)
-            # Notify case worker
-            if profile.assigned_case_worker:
-                Notification.objects.create(
-                    user=profile.assigned_case_worker,
-                    message=f'⚠️ تنبيه: {profile.user.full_name} يحتاج دعم نفسي عاجل',
-                    link=f'/caseworker/profile/{profile.id}/'
-                )
-    
-    # Housing support if homeless
-    if checkin.housing_status == 'homeless':
-        ticket, created = SupportTicket.objects.get_or_create(
-            release_profile=profile,
-            ticket_type='housing',
-            status='open',
-            is_auto_generated=True,
-            defaults={
-                'notes': f'إنشاء تلقائي: بدون مأوى في الشهر {checkin.month_index}'
-            }
+    created_tickets = []
+    if needed:
+        # Skip types that already have an open auto ticket, insert the rest at once
+        existing_types = set(
+            SupportTicket.objects.filter(
+                release_profile=profile,
+                ticket_type__in=[ticket_type for ticket_type, _ in needed],
+                status='open',
+                is_auto_generated=True,
+            ).values_list('ticket_type', flat=True)
         )
-        if created:
-            created_tickets.append(ticket)
-            # Notify case worker
-            if profile.assigned_case_worker:
-                Notification.objects.create(
-                    user=profile.assigned_case_worker,
-                    message=f'🏠 تنبيه: {profile.user.full_name} بدون مأوى',
+        created_tickets = SupportTicket.objects.bulk_create([
+            SupportTicket(
+                release_profile=profile,
+                ticket_type=ticket_type,
+                status='open',
+                is_auto_generated=True,
+                notes=notes,
+            )
+            for ticket_type, notes in needed
+            if ticket_type not in existing_types
+        ])
+    
+    notifications = []
+    
+    # Notify case worker about new urgent tickets
+    if profile.assigned_case_worker_id:
+        for ticket in created_tickets:
+            if ticket.ticket_type in CASE_WORKER_ALERTS:
+                notifications.append(Notification(
+                    user_id=profile.assigned_case_worker_id,
+                    message=CASE_WORKER_ALERTS[ticket.ticket_type].format(name=profile.user.full_name),
                     link=f'/caseworker/profile/{profile.id}/'
-                )
-    
-    # Job support if unemployed
-    if checkin.job_status == 'unemployed':
-        ticket, created = SupportTicket.objects.get_or_create(
-            release_profile=profile,
-            ticket_type='job',
-            status='open',
-            is_auto_generated=True,
-            defaults={
-                'notes': f'إنشاء تلقائي: عاطل عن العمل في الشهر {checkin.month_index}'
-            }
-        )
-        if created:
-            created_tickets.append(ticket)
-    
-    # Social support if family problems
-    if checkin.family_status in ['problematic', 'no_contact']:
-        ticket, created = SupportTicket.objects.get_or_create(
-            release_profile=profile,
-            ticket_type='social',
-            status='open',
-            is_auto_generated=True,
-            defaults={
-                'notes': f'إنشاء تلقائي: مشكلات عائلية في الشهر {checkin.month_index}'
-            }
-        )
-        if created:
-            created_tickets.append(ticket)
+                ))
     
     # Create notification for beneficiary
     if new_risk_level != old_risk_level:
@@ -152,11 +186,14 @@ def process_checkin(checkin):
             'yellow': '⚠️ هناك بعض المخاوف. سيتواصل معك أخصائي قريباً.',
             'red': '🚨 نحتاج للتواصل معك بشكل عاجل. يرجى الانتظار لمكالمة من الأخصائي.',
         }
-        Notification.objects.create(
+        notifications.append(Notification(
             user=profile.user,
             message=risk_messages[new_risk_level],
             link='/beneficiary/dashboard/'
-        )
+        ))
+    
+    if notifications:
+        Notification.objects.bulk_create(notifications)
     
     return {
         'old_risk_level': old_risk_level,
@@ -176,7 +213,8 @@ def get_risk_summary(profile):
     Returns:
         dict: Summary with risk factors and recommendations
     """
-    latest_checkin = profile.checkins.first()
+    # Kept current on check-in save/delete; select_related('latest_checkin') makes this free
+    latest_checkin = profile.latest_checkin
     
     if not latest_checkin:
         return {
@@ -189,25 +227,10 @@ def get_risk_summary(profile):
     recommendations = []
     
     # Analyze latest check-in
-    if latest_checkin.mental_state == 'bad':
-        factors.append('الحالة النفسية سيئة')
-        recommendations.append('إحالة للدعم النفسي عبر خط تراحم')
-    
-    if latest_checkin.housing_status == 'homeless':
-        factors.append('بدون مأوى')
-        recommendations.append('التنسيق مع جمعية الإسكان الخيري')
-    
-    if latest_checkin.job_status == 'unemployed':
-        factors.append('عاطل عن العمل')
-        recommendations.append('عرض فرص العمل المتاحة في المنطقة')
-    
-    if latest_checkin.family_status == 'problematic':
-        factors.append('مشكلات عائلية')
-        recommendations.append('جلسة إرشاد أسري')
-    
-    if latest_checkin.family_status == 'no_contact':
-        factors.append('انقطاع التواصل الأسري')
-        recommendations.append('محاولة إعادة بناء الروابط الأسرية')
+    for field, value, _, _, factor, recommendation in RISK_RULES:
+        if getattr(latest_checkin, field) == value:
+            factors.append(factor)
+            recommendations.append(recommendation)
     
     return {
         'risk_level': profile.risk_level,
@@ -3,32 +3,170 @@ DRF Serializers for عودة آمنة - Safe Return
 REST API serialization for all models.
 """
 
+import copy
+import operator
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
 from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
 from .models import (
     User, ReleaseProfile, MonthlyCheckin, 
     JobOpportunity, SupportTicket, Notification
 )
 
 
-class UserSerializer(serializers.ModelSerializer):
+@lru_cache(maxsize=None)
+def choice_labels(model, field_name):
+    """Value -> label dict for a model choice field, built once per process."""
+    return dict(model._meta.get_field(field_name).flatchoices)
+
+
+class ChoiceDisplayField(serializers.ReadOnlyField):
+    """
+    Read-only label of a choice field, e.g. ChoiceDisplayField(source='status').
+    Replaces CharField(source='get_status_display') with a cached dict lookup.
+    """
+    
+    def bind(self, field_name, parent):
+        super().bind(field_name, parent)
+        self.labels = choice_labels(parent.Meta.model, self.source)
+    
+    def to_representation(self, value):
+        return self.labels.get(value, value)
+
+
+# DRF fields whose to_representation() returns a column's value unchanged
+PASSTHROUGH_FIELDS = frozenset({
+    serializers.BigIntegerField, serializers.BooleanField, serializers.CharField,
+    serializers.ChoiceField, serializers.IntegerField, serializers.URLField,
+})
+
+
+def represent_field(field, instance, ret):
+    """One step of Serializer.to_representation() for a single field."""
+    try:
+        attribute = field.get_attribute(instance)
+    except SkipField:
+        return
+    # Same None / pk-only handling as Serializer.to_representation
+    check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+    ret[field.field_name] = None if check_for_none is None else field.to_representation(attribute)
+
+
+class CachedFieldsMixin:
+    """
+    Builds a ModelSerializer's fields once per class instead of per instance.
+    get_fields() introspects the model on every call; later instances get
+    fresh (unbound) copies of the cached fields. to_representation() is
+    compiled per class into straight-line code on first use.
+    """
+    _fields_cache = {}
+    _compiled = {}
+    
+    def to_representation(self, instance):
+        cls = type(self)
+        if cls not in self._compiled:
+            self._compiled[cls] = self.compile_to_representation()
+        return self._compiled[cls](self.fields, instance)
+    
+    def compile_to_representation(self):
+        """
+        Generate this class's to_representation(): plain column fields become
+        direct attribute reads, every other field goes through represent_field().
+        """
+        self.fields  # fills the class's cache entry
+        fields, column_sources = self._fields_cache[type(self)]
+        lines = ['def to_representation(fields, instance):', '    ret = {}']
+        for name, field in fields.items():
+            if field.write_only:
+                continue
+            column = column_sources.get(name)
+            if column and type(field) in PASSTHROUGH_FIELDS and not getattr(field, 'coerce_to_string', False):
+                lines.append(f'    ret[{name!r}] = instance.{column}')
+            elif column and type(field) is ChoiceDisplayField:
+                lines.append(f'    value = instance.{column}')
+                lines.append(f'    ret[{name!r}] = fields[{name!r}].labels.get(value, value)')
+            else:
+                lines.append(f'    represent_field(fields[{name!r}], instance, ret)')
+        lines.append('    return ret')
+        namespace = {'represent_field': represent_field}
+        exec('\n'.join(lines), namespace)
+        return namespace['to_representation']
+    
+    def get_fields(self):
+        cls = type(self)
+        if cls not in self._fields_cache:
+            fields = super().get_fields()
+            self._fields_cache[cls] = (fields, self.get_column_sources(fields))
+        fields, column_sources = self._fields_cache[cls]
+        fields = copy.deepcopy(fields)
+        # Plain column reads skip Field.get_attribute's generic source walk
+        for name, attname in column_sources.items():
+            fields[name].get_attribute = operator.attrgetter(attname)
+        return fields
+    
+    def get_column_sources(self, fields):
+        """Field name -> attname for fields that just read a concrete, non-relation column."""
+        opts = self.Meta.model._meta
+        column_sources = {}
+        for name, field in fields.items():
+            if isinstance(field, (serializers.BaseSerializer, serializers.RelatedField, serializers.ManyRelatedField)):
+                continue
+            try:
+                model_field = opts.get_field(field.source or name)
+            except FieldDoesNotExist:
+                continue
+            if model_field.concrete and not model_field.is_relation:
+                column_sources[name] = model_field.attname
+        return column_sources
+
+
+class CachedChildListSerializer(serializers.ListSerializer):
+    """
+    many=True serializer that resolves the child's readable fields once per
+    list instead of once per item, then runs the per-item loop inline.
+    """
+    
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        if isinstance(self.child, CachedFieldsMixin):
+            # Already compiled down to one function call per item
+            to_representation = self.child.to_representation
+            return [to_representation(item) for item in iterable]
+        fields = list(self.child._readable_fields)
+        rows = []
+        for item in iterable:
+            row = {}
+            for field in fields:
+                represent_field(field, item, row)
+            rows.append(row)
+        return rows
+
+
+class UserSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for User model."""
-    role_display = serializers.CharField(source='get_role_display', read_only=True)
+    role_display = ChoiceDisplayField(source='role')
     
     class Meta:
         model = User
+        list_serializer_class = CachedChildListSerializer
         fields = ['id', 'national_id', 'full_name', 'role', 'role_display', 'phone', 'created_at']
         read_only_fields = ['id', 'created_at']
 
 
-class MonthlyCheckinSerializer(serializers.ModelSerializer):
+class MonthlyCheckinSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for MonthlyCheckin model."""
-    housing_status_display = serializers.CharField(source='get_housing_status_display', read_only=True)
-    job_status_display = serializers.CharField(source='get_job_status_display', read_only=True)
-    mental_state_display = serializers.CharField(source='get_mental_state_display', read_only=True)
-    family_status_display = serializers.CharField(source='get_family_status_display', read_only=True)
+    housing_status_display = ChoiceDisplayField(source='housing_status')
+    job_status_display = ChoiceDisplayField(source='job_status')
+    mental_state_display = ChoiceDisplayField(source='mental_state')
+    family_status_display = ChoiceDisplayField(source='family_status')
     
     class Meta:
         model = MonthlyCheckin
+        list_serializer_class = CachedChildListSerializer
         fields = [
             'id', 'release_profile', 'month_index',
             'housing_status', 'housing_status_display',
@@ -40,14 +178,15 @@ class MonthlyCheckinSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class SupportTicketSerializer(serializers.ModelSerializer):
+class SupportTicketSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for SupportTicket model."""
-    ticket_type_display = serializers.CharField(source='get_ticket_type_display', read_only=True)
-    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    ticket_type_display = ChoiceDisplayField(source='ticket_type')
+    status_display = ChoiceDisplayField(source='status')
     created_by_name = serializers.CharField(source='created_by.full_name', read_only=True)
     
     class Meta:
         model = SupportTicket
+        list_serializer_class = CachedChildListSerializer
         fields = [
             'id', 'release_profile', 'created_by', 'created_by_name',
             'ticket_type', 'ticket_type_display',
@@ -57,11 +196,11 @@ class SupportTicketSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class ReleaseProfileSerializer(serializers.ModelSerializer):
+class ReleaseProfileSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for ReleaseProfile model."""
     user = UserSerializer(read_only=True)
-    risk_level_display = serializers.CharField(source='get_risk_level_display', read_only=True)
-    city_display = serializers.CharField(source='get_city_display', read_only=True)
+    risk_level_display = ChoiceDisplayField(source='risk_level')
+    city_display = ChoiceDisplayField(source='city')
     current_month = serializers.IntegerField(read_only=True)
     progress_percentage = serializers.IntegerField(read_only=True)
     assigned_case_worker_name = serializers.CharField(
@@ -73,6 +212,7 @@ class ReleaseProfileSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = ReleaseProfile
+        list_serializer_class = CachedChildListSerializer
         fields = [
             'id', 'user', 'release_date', 'end_of_followup_date',
             'risk_level', 'risk_level_display',
@@ -84,18 +224,19 @@ class ReleaseProfileSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class ReleaseProfileListSerializer(serializers.ModelSerializer):
+class ReleaseProfileListSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Lightweight serializer for listing profiles."""
     user_name = serializers.CharField(source='user.full_name', read_only=True)
     user_national_id = serializers.CharField(source='user.national_id', read_only=True)
-    risk_level_display = serializers.CharField(source='get_risk_level_display', read_only=True)
-    city_display = serializers.CharField(source='get_city_display', read_only=True)
+    risk_level_display = ChoiceDisplayField(source='risk_level')
+    city_display = ChoiceDisplayField(source='city')
     current_month = serializers.IntegerField(read_only=True)
     progress_percentage = serializers.IntegerField(read_only=True)
-    open_tickets_count = serializers.SerializerMethodField()
+    open_tickets_count = serializers.IntegerField(read_only=True)  # annotated by the view
     
     class Meta:
         model = ReleaseProfile
+        list_serializer_class = CachedChildListSerializer
         fields = [
             'id', 'user_name', 'user_national_id',
             'risk_level', 'risk_level_display',
@@ -103,17 +244,15 @@ class ReleaseProfileListSerializer(serializers.ModelSerializer):
             'current_month', 'progress_percentage',
             'open_tickets_count', 'is_completed'
         ]
-    
-    def get_open_tickets_count(self, obj):
-        return obj.tickets.filter(status='open').count()
 
 
-class JobOpportunitySerializer(serializers.ModelSerializer):
+class JobOpportunitySerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for JobOpportunity model."""
-    city_display = serializers.CharField(source='get_city_display', read_only=True)
+    city_display = ChoiceDisplayField(source='city')
     
     class Meta:
         model = JobOpportunity
+        list_serializer_class = CachedChildListSerializer
         fields = [
             'id', 'title', 'company', 'description',
             'city', 'city_display', 'is_active', 'link_url', 'created_at'
@@ -121,11 +260,12 @@ class JobOpportunitySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for Notification model."""
     
     class Meta:
         model = Notification
+        list_serializer_class = CachedChildListSerializer
         fields = ['id', 'user', 'message', 'link', 'is_read', 'created_at']
         read_only_fields = ['id', 'created_at']
 
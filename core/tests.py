@@ -1,3 +1,162 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from unittest import mock
+
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import JobOpportunity, MonthlyCheckin, Notification, ReleaseProfile, SupportTicket, User
+from .risk_engine import bulk_recompute_risk, calculate_risk_level, process_checkin
+
+
+class BeneficiaryDashboardETagTests(TestCase):
+    """The dashboard answers 304 while nothing it shows has changed, and 200 once something has."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.case_worker = User.objects.create(
+            national_id='2000000001', full_name='سارة الأخصائية', role='case_worker', phone='0551234567'
+        )
+        cls.user = User.objects.create(national_id='1000000001', full_name='أحمد', phone='0501112222')
+        cls.profile = ReleaseProfile.objects.create(
+            user=cls.user,
+            release_date=timezone.now().date() - timedelta(days=29),
+            city='riyadh',
+            assigned_case_worker=cls.case_worker,
+        )
+        cls.job = JobOpportunity.objects.create(title='فني صيانة', company='شركة', city='riyadh')
+        cls.old_ticket = SupportTicket.objects.create(release_profile=cls.profile, ticket_type='job')
+        SupportTicket.objects.create(release_profile=cls.profile, ticket_type='housing')
+
+    def setUp(self):
+        session = self.client.session
+        session['user_id'] = self.user.id
+        session.save()
+        self.url = reverse('beneficiary_dashboard')
+
+    def assertChangeInvalidates(self, change):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        change()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_plan_month_rollover(self):
+        # 01:00 -> 04:00 in Riyadh is the same local day, but the UTC date (which
+        # current_month counts from) moves on: day 29 -> day 30, month 1 -> 2
+        release_date = self.profile.release_date
+        before = datetime.combine(release_date + timedelta(days=29), time(22), tzinfo=dt_timezone.utc)
+        now = mock.patch('django.utils.timezone.now', return_value=before)
+        self.addCleanup(now.stop)
+        clock = now.start()
+
+        def change():
+            clock.return_value = before + timedelta(hours=3)
+        self.assertChangeInvalidates(change)
+
+    def test_job_edit(self):
+        def change():
+            self.job.title = 'كهربائي'
+            self.job.save()
+        self.assertChangeInvalidates(change)
+
+    def test_ticket_delete(self):
+        self.assertChangeInvalidates(self.old_ticket.delete)
+
+    def test_case_worker_phone(self):
+        def change():
+            self.case_worker.phone = '0559876543'
+            self.case_worker.save()
+        self.assertChangeInvalidates(change)
+
+    def test_checkin_delete(self):
+        checkin = MonthlyCheckin.objects.create(
+            release_profile=self.profile, month_index=1, housing_status='stable',
+            job_status='employed', mental_state='good', family_status='supportive',
+        )
+        self.assertChangeInvalidates(checkin.delete)
+
+
+class ProcessCheckinTicketTests(TestCase):
+    """Auto tickets are opened once per type, and only new tickets alert the case worker."""
+
+    def setUp(self):
+        self.case_worker = User.objects.create(national_id='2000000001', full_name='سارة', role='case_worker')
+        user = User.objects.create(national_id='1000000001', full_name='أحمد')
+        self.profile = ReleaseProfile.objects.create(
+            user=user, release_date=timezone.now().date(), assigned_case_worker=self.case_worker
+        )
+
+    def submit(self, month_index):
+        checkin = MonthlyCheckin.objects.create(
+            release_profile=self.profile, month_index=month_index, housing_status='homeless',
+            job_status='unemployed', mental_state='bad', family_status='no_contact',
+        )
+        return process_checkin(checkin)
+
+    def test_repeat_checkin_does_not_duplicate_tickets(self):
+        first = self.submit(1)
+        self.assertEqual(
+            sorted(ticket.ticket_type for ticket in first['created_tickets']),
+            ['housing', 'job', 'psychological', 'social'],
+        )
+        self.assertEqual(Notification.objects.filter(user=self.case_worker).count(), 2)
+
+        second = self.submit(2)
+        self.assertEqual(second['created_tickets'], [])
+        open_auto = SupportTicket.objects.filter(release_profile=self.profile, status='open', is_auto_generated=True)
+        self.assertEqual(open_auto.count(), 4)
+        self.assertEqual(open_auto.values('ticket_type').distinct().count(), 4)
+        # No new tickets, so no new case worker alerts
+        self.assertEqual(Notification.objects.filter(user=self.case_worker).count(), 2)
+
+    def test_closed_ticket_is_reopened_with_one_alert(self):
+        self.submit(1)
+        SupportTicket.objects.filter(release_profile=self.profile, ticket_type='psychological').update(status='closed')
+
+        again = self.submit(2)
+        self.assertEqual([ticket.ticket_type for ticket in again['created_tickets']], ['psychological'])
+        self.assertEqual(Notification.objects.filter(user=self.case_worker).count(), 3)
+
+
+class BulkRecomputeRiskTests(TestCase):
+    """bulk_recompute_risk's SQL CASE must agree with calculate_risk_level on every rule."""
+
+    GOOD = {'housing_status': 'stable', 'job_status': 'employed', 'mental_state': 'good', 'family_status': 'supportive'}
+    BRANCHES = [
+        {'mental_state': 'bad'},
+        {'housing_status': 'homeless'},
+        {'job_status': 'unemployed'},
+        {'family_status': 'problematic'},
+        {'family_status': 'no_contact'},
+        {'mental_state': 'stressed'},
+        {},  # all good
+    ]
+
+    def setUp(self):
+        self.profiles = []
+        for n, answers in enumerate(self.BRANCHES):
+            user = User.objects.create(national_id=f'10000000{n:02}', full_name=f'مستفيد {n}')
+            profile = ReleaseProfile.objects.create(user=user, release_date=timezone.now().date(), risk_level='green')
+            # An older, worse check-in must not count: only the latest one does
+            MonthlyCheckin.objects.create(release_profile=profile, month_index=1, **dict(self.GOOD, mental_state='bad'))
+            MonthlyCheckin.objects.create(release_profile=profile, month_index=2, **dict(self.GOOD, **answers))
+            self.profiles.append(profile)
+        user = User.objects.create(national_id='1000000099', full_name='بدون متابعة')
+        self.without_checkins = ReleaseProfile.objects.create(user=user, release_date=timezone.now().date(), risk_level='red')
+
+    def test_matches_calculate_risk_level(self):
+        # Every branch except "all good" moves off green
+        self.assertEqual(bulk_recompute_risk(), len(self.BRANCHES) - 1)
+
+        for profile in ReleaseProfile.objects.filter(pk__in=[p.pk for p in self.profiles]).select_related('latest_checkin'):
+            with self.subTest(checkin=profile.latest_checkin):
+                self.assertEqual(profile.risk_level, calculate_risk_level(profile.latest_checkin))
+        self.without_checkins.refresh_from_db()
+        self.assertEqual(self.without_checkins.risk_level, 'red')
 
-# Create your tests here.
+        # Nothing left to change
+        self.assertEqual(bulk_recompute_risk(), 0)
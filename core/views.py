@@ -3,12 +3,24 @@ Views for عودة آمنة - Safe Return
 Both template-based views and DRF API views.
 """
 
+import hashlib
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import (
+    Case, Count, IntegerField, Max, OuterRef, Prefetch, Q, Subquery, Value, When
+)
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
+from django.utils import timezone
+from django.http import Http404, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition, etag, require_POST
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib import messages
-from rest_framework import viewsets, status
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from rest_framework import serializers, viewsets, status
 from rest_framework.decorators import api_view, action
 from rest_framework.response import Response
 
@@ -19,7 +31,7 @@ from .models import (
 from .serializers import (
     UserSerializer, ReleaseProfileSerializer, ReleaseProfileListSerializer,
     MonthlyCheckinSerializer, JobOpportunitySerializer, 
-    SupportTicketSerializer, NotificationSerializer
+    SupportTicketSerializer, NotificationSerializer, choice_labels
 )
 from .risk_engine import process_checkin, get_risk_summary
 
@@ -39,12 +51,14 @@ def absher_login(request):
     if request.method == 'POST':
         national_id = request.POST.get('national_id', '').strip()
         
-        try:
-            user = User.objects.get(national_id=national_id, role='beneficiary')
-            request.session['user_id'] = user.id
+        # Only the id is needed for the session; unknown IDs just get None
+        user_id = User.objects.filter(
+            national_id=national_id, role='beneficiary'
+        ).values_list('id', flat=True).first()
+        if user_id:
+            request.session['user_id'] = user_id
             return redirect('beneficiary_dashboard')
-        except User.DoesNotExist:
-            error = 'رقم الهوية غير مسجل في برنامج عودة آمنة'
+        error = 'رقم الهوية غير مسجل في برنامج عودة آمنة'
     
     return render(request, 'core/absher_login.html', {'error': error})
 
@@ -77,20 +91,79 @@ def logout_view(request):
 
 
 def get_current_user(request):
-    """Helper to get current simulated user from session."""
-    user_id = request.session.get('user_id')
-    if user_id:
-        try:
-            return User.objects.get(id=user_id)
-        except User.DoesNotExist:
-            pass
-    return None
+    """
+    Helper to get current simulated user from session.
+    Loaded once per request, together with the beneficiary's profile.
+    """
+    if not hasattr(request, '_current_user'):
+        user_id = request.session.get('user_id')
+        request._current_user = User.objects.select_related(
+            'release_profile__assigned_case_worker', 'release_profile__latest_checkin'
+        ).filter(id=user_id).first() if user_id else None
+    return request._current_user
 
 
 # -----------------------------------------------------------------------------
 # Beneficiary Views
 # -----------------------------------------------------------------------------
 
+def _beneficiary_dashboard_etag(request):
+    """
+    ETag for the beneficiary dashboard, so unchanged reloads get a 304.
+    Covers the user, profile, case worker, plan month, check-ins, tickets,
+    unread notifications and the city's jobs (the "time since" labels are
+    not tracked). Returns None (no conditional handling) whenever the full
+    view must run.
+    """
+    user = get_current_user(request)
+    if not user or user.role != 'beneficiary' or len(messages.get_messages(request)):
+        return None
+    try:
+        profile = user.release_profile
+    except ReleaseProfile.DoesNotExist:
+        return None
+    
+    # profile.updated_at moves on every profile edit and check-in save or delete
+    state = ReleaseProfile.objects.filter(pk=profile.pk).annotate(
+        tickets_changed=Subquery(
+            SupportTicket.objects.filter(release_profile=OuterRef('pk'))
+            .values('release_profile').annotate(m=Max('updated_at')).values('m')
+        ),
+        tickets_count=Subquery(
+            SupportTicket.objects.filter(release_profile=OuterRef('pk'))
+            .values('release_profile').annotate(n=Count('id')).values('n')
+        ),
+        unread_latest=Subquery(
+            Notification.objects.filter(user=OuterRef('user'), is_read=False)
+            .values('user').annotate(m=Max('created_at')).values('m')
+        ),
+        unread_count=Subquery(
+            Notification.objects.filter(user=OuterRef('user'), is_read=False)
+            .values('user').annotate(n=Count('id')).values('n')
+        ),
+        jobs_latest=Subquery(
+            JobOpportunity.objects.filter(city=OuterRef('city'), is_active=True)
+            .values('city').annotate(m=Max('updated_at')).values('m')
+        ),
+        jobs_count=Subquery(
+            JobOpportunity.objects.filter(city=OuterRef('city'), is_active=True)
+            .values('city').annotate(n=Count('id')).values('n')
+        ),
+    ).values_list(
+        'updated_at', 'tickets_changed', 'tickets_count',
+        'unread_latest', 'unread_count', 'jobs_latest', 'jobs_count',
+    ).get()
+    
+    # The plan month rolls over with the (UTC) date, so it is part of the tag too
+    case_worker = profile.assigned_case_worker
+    key = repr((
+        user.id, user.full_name, user.national_id, profile.current_month,
+        case_worker and (case_worker.full_name, case_worker.phone), state,
+    ))
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+@condition(etag_func=_beneficiary_dashboard_etag)
 def beneficiary_dashboard(request):
     """
     Main dashboard for beneficiaries (released persons).
@@ -105,8 +178,13 @@ def beneficiary_dashboard(request):
     except ReleaseProfile.DoesNotExist:
         return render(request, 'core/no_profile.html', {'user': user})
     
-    # Get checkins organized by month
-    checkins = {c.month_index: c for c in profile.checkins.all()}
+    # Get checkins organized by month; the page only needs the status flags
+    checkins_qs = profile.checkins.only(
+        'id', 'release_profile', 'month_index',
+        'housing_status', 'job_status', 'mental_state', 'family_status',
+    )
+    checkins = {c.month_index: c for c in checkins_qs}
+    latest_checkin = checkins[max(checkins)] if checkins else None
     months = []
     for i in range(1, 13):
         months.append({
@@ -118,7 +196,9 @@ def beneficiary_dashboard(request):
         })
     
     # Get notifications
-    notifications = Notification.objects.filter(user=user, is_read=False)[:5]
+    notifications = Notification.objects.filter(user=user, is_read=False).values(
+        'id', 'message', 'link', 'created_at'
+    ).order_by('-created_at')[:5]
     
     # Get open tickets
     open_tickets = profile.tickets.filter(status__in=['open', 'in_progress'])
@@ -130,6 +210,8 @@ def beneficiary_dashboard(request):
         'user': user,
         'profile': profile,
         'months': months,
+        'checkins_count': len(checkins),
+        'latest_checkin': latest_checkin,
         'notifications': notifications,
         'open_tickets': open_tickets,
         'jobs': jobs,
@@ -159,21 +241,23 @@ def checkin_form(request, month_index=None):
     existing_checkin = profile.checkins.filter(month_index=month_index).first()
     
     if request.method == 'POST':
-        # Create or update check-in
-        checkin, created = MonthlyCheckin.objects.update_or_create(
-            release_profile=profile,
-            month_index=month_index,
-            defaults={
-                'housing_status': request.POST.get('housing_status'),
-                'job_status': request.POST.get('job_status'),
-                'mental_state': request.POST.get('mental_state'),
-                'family_status': request.POST.get('family_status'),
-                'free_text_notes': request.POST.get('free_text_notes', ''),
-            }
-        )
-        
-        # Process the check-in (calculate risk, create tickets)
-        result = process_checkin(checkin)
+        # Save and process as one transaction
+        with transaction.atomic():
+            # Create or update check-in
+            checkin, created = MonthlyCheckin.objects.update_or_create(
+                release_profile=profile,
+                month_index=month_index,
+                defaults={
+                    'housing_status': request.POST.get('housing_status'),
+                    'job_status': request.POST.get('job_status'),
+                    'mental_state': request.POST.get('mental_state'),
+                    'family_status': request.POST.get('family_status'),
+                    'free_text_notes': request.POST.get('free_text_notes', ''),
+                }
+            )
+            
+            # Process the check-in (calculate risk, create tickets)
+            result = process_checkin(checkin)
         
         messages.success(request, f'✅ تم حفظ المتابعة الشهرية للشهر {month_index}')
         return redirect('beneficiary_dashboard')
@@ -256,12 +340,15 @@ def job_list(request):
         user_city = None
     
     # Get jobs, prioritizing user's city
+    jobs = JobOpportunity.objects.filter(is_active=True)
     if user_city:
-        jobs_in_city = JobOpportunity.objects.filter(is_active=True, city=user_city)
-        jobs_other = JobOpportunity.objects.filter(is_active=True).exclude(city=user_city)
-        jobs = list(jobs_in_city) + list(jobs_other)
-    else:
-        jobs = JobOpportunity.objects.filter(is_active=True)
+        jobs = jobs.annotate(
+            city_priority=Case(
+                When(city=user_city, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        ).order_by('city_priority', '-created_at')
     
     context = {
         'user': user,
@@ -287,27 +374,38 @@ def caseworker_dashboard(request):
     risk_filter = request.GET.get('risk', '')
     city_filter = request.GET.get('city', '')
     
-    # Get all profiles (or assigned to this caseworker)
-    profiles = ReleaseProfile.objects.select_related('user').prefetch_related('checkins', 'tickets')
+    # Get all profiles (or assigned to this caseworker); the table only shows open tickets
+    profiles = ReleaseProfile.objects.select_related('user').prefetch_related(
+        Prefetch(
+            'tickets',
+            queryset=SupportTicket.objects.filter(status__in=['open', 'in_progress']),
+            to_attr='open_tickets_cached',
+        )
+    )
     
     if risk_filter:
         profiles = profiles.filter(risk_level=risk_filter)
     if city_filter:
         profiles = profiles.filter(city=city_filter)
     
-    # Count by risk level for summary
-    risk_counts = {
-        'red': ReleaseProfile.objects.filter(risk_level='red', is_completed=False).count(),
-        'yellow': ReleaseProfile.objects.filter(risk_level='yellow', is_completed=False).count(),
-        'green': ReleaseProfile.objects.filter(risk_level='green', is_completed=False).count(),
-    }
+    # Count by risk level for summary (one query for all three)
+    risk_counts = ReleaseProfile.objects.filter(is_completed=False).aggregate(
+        red=Count('id', filter=Q(risk_level='red')),
+        yellow=Count('id', filter=Q(risk_level='yellow')),
+        green=Count('id', filter=Q(risk_level='green')),
+    )
     
     # Get notifications for this caseworker
-    notifications = Notification.objects.filter(user=user, is_read=False)[:5]
+    notifications = Notification.objects.filter(user=user, is_read=False).values(
+        'id', 'message', 'link', 'created_at'
+    ).order_by('-created_at')[:5]
+    
+    # Only one page of profiles is loaded (and prefetched) per request
+    paginator = Paginator(profiles.filter(is_completed=False).order_by('-created_at', '-id'), 50)
     
     context = {
         'user': user,
-        'profiles': profiles.filter(is_completed=False),
+        'profiles': paginator.get_page(request.GET.get('page')),
         'risk_counts': risk_counts,
         'notifications': notifications,
         'risk_filter': risk_filter,
@@ -325,7 +423,9 @@ def profile_detail(request, profile_id):
     if not user or user.role not in ['case_worker', 'admin']:
         return redirect('login_select')
     
-    profile = get_object_or_404(ReleaseProfile, id=profile_id)
+    profile = get_object_or_404(
+        ReleaseProfile.objects.select_related('user', 'latest_checkin'), id=profile_id
+    )
     
     # Get all checkins
     checkins = profile.checkins.all().order_by('month_index')
@@ -393,19 +493,23 @@ def update_ticket_status(request, ticket_id):
     if not user or user.role not in ['case_worker', 'admin']:
         return JsonResponse({'error': 'Unauthorized'}, status=403)
     
-    ticket = get_object_or_404(SupportTicket, id=ticket_id)
+    ticket = get_object_or_404(SupportTicket.objects.select_related('release_profile'), id=ticket_id)
     new_status = request.POST.get('status')
     
     if new_status in dict(SupportTicket.STATUS_CHOICES):
-        ticket.status = new_status
-        ticket.save()
-        
-        # Notify beneficiary of status change
-        Notification.objects.create(
-            user=ticket.release_profile.user,
-            message=f'📋 تم تحديث حالة التذكرة: {ticket.get_status_display()}',
-            link='/beneficiary/dashboard/'
-        )
+        with transaction.atomic():
+            # Status-only UPDATE; no full-row save
+            SupportTicket.objects.filter(id=ticket.id).update(
+                status=new_status, updated_at=timezone.now()
+            )
+            ticket.status = new_status
+            
+            # Notify beneficiary of status change
+            Notification.objects.create(
+                user_id=ticket.release_profile.user_id,
+                message=f'📋 تم تحديث حالة التذكرة: {ticket.get_status_display()}',
+                link='/beneficiary/dashboard/'
+            )
         
         return JsonResponse({'success': True, 'new_status': ticket.get_status_display()})
     
@@ -423,7 +527,7 @@ def mark_profile_completed(request, profile_id):
     
     profile = get_object_or_404(ReleaseProfile, id=profile_id)
     profile.is_completed = True
-    profile.save()
+    profile.save(update_fields=['is_completed', 'updated_at'])
     
     # Notify beneficiary
     Notification.objects.create(
@@ -443,9 +547,10 @@ def mark_notification_read(request, notification_id):
     if not user:
         return JsonResponse({'error': 'Unauthorized'}, status=403)
     
-    notification = get_object_or_404(Notification, id=notification_id, user=user)
-    notification.is_read = True
-    notification.save()
+    # Single UPDATE; zero rows means it doesn't exist or isn't this user's
+    updated = Notification.objects.filter(id=notification_id, user=user).update(is_read=True)
+    if not updated:
+        raise Http404('No Notification matches the given query.')
     
     return JsonResponse({'success': True})
 
@@ -454,6 +559,34 @@ def mark_notification_read(request, notification_id):
 # REST API ViewSets (for API access)
 # =============================================================================
 
+class ValuesListMixin:
+    """
+    Serves list() straight from queryset.values(), skipping model instances
+    and serializer fields. Set list_fields to the serializer's model fields;
+    add computed keys in list_row(). Other actions use the serializer.
+    """
+    list_fields = ()
+    datetime_field = serializers.DateTimeField()
+    
+    def list_row(self, row):
+        return row
+    
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).values(*self.list_fields)
+        page = self.paginate_queryset(queryset)
+        data = []
+        for row in (queryset if page is None else page):
+            # New dicts: the paginator still reads the raw rows for its cursor.
+            # Datetimes get the local-time ISO format the serializer would produce
+            data.append(self.list_row({
+                key: self.datetime_field.to_representation(value) if isinstance(value, datetime) else value
+                for key, value in row.items()
+            }))
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
 class UserViewSet(viewsets.ModelViewSet):
     """API endpoint for users."""
     queryset = User.objects.all()
@@ -464,6 +597,23 @@ class ReleaseProfileViewSet(viewsets.ModelViewSet):
     """API endpoint for release profiles."""
     queryset = ReleaseProfile.objects.all()
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            # Counted in the same query instead of once per serialized profile
+            queryset = queryset.select_related('user').annotate(
+                open_tickets_count=Count('tickets', filter=Q(tickets__status='open'))
+            )
+        elif self.action in ('retrieve', 'update', 'partial_update'):
+            # The detail serializer nests check-ins and tickets; load them up front
+            queryset = queryset.select_related('user', 'assigned_case_worker').prefetch_related(
+                'checkins',
+                Prefetch('tickets', queryset=SupportTicket.objects.select_related('created_by')),
+            )
+        elif self.action == 'risk_summary':
+            queryset = queryset.select_related('latest_checkin')
+        return queryset
+    
     def get_serializer_class(self):
         if self.action == 'list':
             return ReleaseProfileListSerializer
@@ -473,11 +623,17 @@ class ReleaseProfileViewSet(viewsets.ModelViewSet):
     def risk_summary(self, request, pk=None):
         """Get risk summary for a profile."""
         profile = self.get_object()
-        summary = get_risk_summary(profile)
-        # Convert checkin to serialized form
-        if summary.get('latest_checkin'):
-            summary['latest_checkin'] = MonthlyCheckinSerializer(summary['latest_checkin']).data
-        return Response(summary)
+        
+        def build_summary():
+            summary = get_risk_summary(profile)
+            # Convert checkin to serialized form
+            if summary.get('latest_checkin'):
+                summary['latest_checkin'] = MonthlyCheckinSerializer(summary['latest_checkin']).data
+            return summary
+        
+        # updated_at moves on every processed check-in, so a new one gets a new key
+        key = f'risk_summary:{profile.pk}:{profile.updated_at.timestamp()}'
+        return Response(cache.get_or_set(key, build_summary, 300))
 
 
 class MonthlyCheckinViewSet(viewsets.ModelViewSet):
@@ -485,16 +641,44 @@ class MonthlyCheckinViewSet(viewsets.ModelViewSet):
     queryset = MonthlyCheckin.objects.all()
     serializer_class = MonthlyCheckinSerializer
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = get_current_user(self.request)
+        if user and user.role == 'beneficiary':
+            # A signed-in beneficiary only sees their own check-ins
+            queryset = queryset.filter(release_profile__user=user)
+        return queryset
+    
     def perform_create(self, serializer):
         """Process checkin after creation."""
         checkin = serializer.save()
-        process_checkin(checkin)
+        # Runs once the check-in row is committed, in its own transaction
+        transaction.on_commit(lambda: process_checkin(checkin))
 
 
-class JobOpportunityViewSet(viewsets.ModelViewSet):
+def _jobs_etag(request, *args, **kwargs):
+    """
+    ETag for the job API reads: changes whenever any job is added, edited or
+    deleted. The renderer is part of it (JSON vs. the browsable API).
+    """
+    state = JobOpportunity.objects.aggregate(changed=Max('updated_at'), count=Count('id'))
+    key = repr((request.accepted_renderer.format, state['changed'], state['count']))
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+@method_decorator(etag(_jobs_etag), name='list')
+@method_decorator(etag(_jobs_etag), name='retrieve')
+class JobOpportunityViewSet(ValuesListMixin, viewsets.ModelViewSet):
     """API endpoint for job opportunities."""
     queryset = JobOpportunity.objects.filter(is_active=True)
     serializer_class = JobOpportunitySerializer
+    list_fields = (
+        'id', 'title', 'company', 'description', 'city', 'is_active', 'link_url', 'created_at'
+    )
+    
+    def list_row(self, row):
+        row['city_display'] = choice_labels(JobOpportunity, 'city').get(row['city'], row['city'])
+        return row
 
 
 class SupportTicketViewSet(viewsets.ModelViewSet):
@@ -503,15 +687,28 @@ class SupportTicketViewSet(viewsets.ModelViewSet):
     serializer_class = SupportTicketSerializer
 
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(ValuesListMixin, viewsets.ModelViewSet):
     """API endpoint for notifications."""
     queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
+    list_fields = ('id', 'user', 'message', 'link', 'is_read', 'created_at')
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = get_current_user(self.request)
+        if user:
+            # Signed-in users only see (and mark) their own notifications
+            queryset = queryset.filter(user=user)
+        return queryset
     
     @action(detail=True, methods=['post'])
     def mark_read(self, request, pk=None):
         """Mark notification as read."""
-        notification = self.get_object()
-        notification.is_read = True
-        notification.save()
+        # One UPDATE instead of loading the row and saving every column
+        try:
+            updated = self.get_queryset().filter(pk=pk).update(is_read=True)
+        except (TypeError, ValueError, ValidationError):
+            updated = 0  # malformed pk: 404 like get_object_or_404
+        if not updated:
+            raise Http404('No Notification matches the given query.')
         return Response({'status': 'read'})
@@ -7,14 +7,23 @@ Hackathon Prototype Settings
 import os
 from pathlib import Path
 
+import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-# SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-hackathon-demo-key-not-for-production'
-
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Off unless DJANGO_DEBUG=1; debug mode also keeps a log of every SQL query
+DEBUG = os.environ.get('DJANGO_DEBUG', '') == '1'
+
+# SECURITY WARNING: keep the secret key used in production secret!
+# The demo key is only accepted in debug mode; deployments must set their own
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    if not DEBUG:
+        raise ImproperlyConfigured('Set DJANGO_SECRET_KEY (or DJANGO_DEBUG=1 for local development).')
+    SECRET_KEY = 'django-insecure-hackathon-demo-key-not-for-production'
 
 ALLOWED_HOSTS = ['*']
 
@@ -76,13 +85,23 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'safe_return.wsgi.application'
 
-# Database - SQLite for hackathon simplicity
+# Database - SQLite for hackathon simplicity, or DATABASE_URL when set
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': dj_database_url.config(
+        default=f'sqlite:///{BASE_DIR / "db.sqlite3"}',
+        # Reuse connections across requests (keeps SQLite's PRAGMAs and page cache warm)
+        conn_max_age=600,
+        conn_health_checks=True,
+    )
 }
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default']['ENGINE'] = 'core.backends.sqlite3'
+    DATABASES['default']['OPTIONS'] = {
+        # Wait up to 20s for another writer instead of failing with "database is locked"
+        'timeout': 20,
+        # Take the write lock when a transaction starts, not on its first write
+        'transaction_mode': 'IMMEDIATE',
+    }
 
 # Password validation (simplified for hackathon)
 AUTH_PASSWORD_VALIDATORS = []
@@ -99,15 +118,25 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Cache - per-process memory for now; swap for Redis when running several workers
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Django REST Framework settings
 REST_FRAMEWORK = {
+    # The browsable API is a development aid; production serves JSON only
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
-    ],
+        'core.renderers.ORJSONRenderer',
+    ] + (['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
+    # List endpoints return at most PAGE_SIZE rows per request
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': 50,
 }
 
 # For hackathon - trust all CSRF